@@ -9,7 +9,14 @@ import torch.nn.functional as F
 
 from colossalai.legacy.moe.load_balance import LoadBalancer
 from colossalai.legacy.moe.utils import create_ep_hierarchical_group, get_noise_generator
-from colossalai.moe._operation import AllGather, AllToAll, HierarchicalAllToAll, MoeCombine, MoeDispatch, ReduceScatter
+from colossalai.moe._operation import (
+    AllGather,
+    AllToAll,
+    HierarchicalAllToAll,
+    ReduceScatter,
+    moe_combine,
+    moe_dispatch,
+)
 from colossalai.shardformer.layer.moe import MLPExperts
 from colossalai.tensor.moe_tensor.api import get_dp_group, get_ep_group, get_ep_group_ranks, get_ep_size
 
@@ -182,7 +189,7 @@ class SparseMLP(nn.Module):
 
         # dispatch_data: (num_experts, capacity, hidden_size)
         if self.enable_kernel:
-            dispatch_data = MoeDispatch.apply(tokens, *route_result_list[1:])
+            dispatch_data = moe_dispatch(tokens, *route_result_list[1:])
             dispatch_data = dispatch_data.reshape(self.num_experts, -1, self.hidden_size)
         else:
             sec_mask_f = route_result_list[1].type_as(inputs)
@@ -202,7 +209,7 @@ class SparseMLP(nn.Module):
 
         if self.enable_kernel:
             expert_output = expert_output.reshape(-1, self.hidden_size)
-            ans = MoeCombine.apply(expert_output, *route_result_list)
+            ans = moe_combine(expert_output, *route_result_list)
         else:
             combine_weights = route_result_list[0].type_as(inputs)
             combine_weights = combine_weights.view(combine_weights.shape[0], -1)
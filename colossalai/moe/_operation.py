@@ -1,4 +1,6 @@
+from collections import defaultdict
 from typing import Any, List, Optional, Tuple
+from weakref import WeakKeyDictionary
 
 import torch
 import torch.distributed as dist
@@ -8,14 +10,116 @@ from torch.distributed import ProcessGroup
 
 from colossalai.quantization.fp8 import all_to_all_single_fp8
 
-MOE_KERNEL = None
+# dtypes with native entry points in the MoE kernel; other dtypes fall back to fp32
+MOE_KERNEL_DTYPES = (torch.float32, torch.float16, torch.bfloat16)
 
 
-def load_moe():
-    global MOE_KERNEL
-    from colossalai.kernel.kernel_loader import MoeLoader
+class _LazyMoeKernel:
+    """Proxy that loads the MoE kernel on first attribute access, so hot call
+    sites can use `MOE_KERNEL.<fn>` directly instead of re-checking an
+    `is None` sentinel on every invocation.
+    """
+
+    __slots__ = ("_kernel",)
+
+    def __init__(self) -> None:
+        self._kernel = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._kernel is None:
+            from colossalai.kernel.kernel_loader import MoeLoader
+
+            self._kernel = MoeLoader().load()
+        return getattr(self._kernel, name)
+
+
+MOE_KERNEL = _LazyMoeKernel()
+
+
+_PG_META: "WeakKeyDictionary[ProcessGroup, Tuple[int, int]]" = WeakKeyDictionary()
+
+
+def _pg_info(group: Optional[ProcessGroup]) -> Tuple[int, int]:
+    """Cached (world_size, rank) of a process group, to avoid the per-call
+    lookup cost of `dist.get_world_size`/`dist.get_rank` in hot MoE loops.
+    Entries are dropped automatically when the group is garbage collected.
+    """
+    if group is None:
+        group = dist.group.WORLD
+    meta = _PG_META.get(group)
+    if meta is None:
+        meta = (dist.get_world_size(group), dist.get_rank(group))
+        _PG_META[group] = meta
+    return meta
+
+
+# small free-list of all-to-all output buffers, keyed on (shape, dtype, device).
+# buffers re-enter the pool in backward, once the autograd graph is done with the
+# activation, so repeated decode-shaped calls skip the allocator entirely.
+# disabled by default: recycling assumes each activation is backpropped exactly
+# once, which does not hold under retain_graph=True or double backward
+_A2A_BUF_CACHE: dict = defaultdict(list)
+_A2A_BUF_CACHE_DEPTH = 2
+_REUSE_COMM_BUFFERS = False
+
+
+def enable_comm_buffer_reuse(enabled: bool = True) -> None:
+    """Toggle recycling of all-to-all output buffers across steps.
+
+    Reuse assumes every all-to-all activation is consumed by exactly one
+    backward pass; it is incompatible with ``backward(retain_graph=True)``
+    and double backward, so it must be opted into explicitly. With reuse on,
+    the forward output must not be read after ``backward()`` either: its
+    buffer re-enters the pool during backward and may immediately be popped
+    as the output of the gradient all-to-all (for symmetric splits it is the
+    same storage), so callers that keep the activation around must clone it
+    before backward.
+    """
+    global _REUSE_COMM_BUFFERS
+    _REUSE_COMM_BUFFERS = enabled
+    if not enabled:
+        _A2A_BUF_CACHE.clear()
 
-    MOE_KERNEL = MoeLoader().load()
+
+def _pop_comm_buffer(shape: Tuple[int, ...], dtype: torch.dtype, device: torch.device) -> Optional[Tensor]:
+    if not _REUSE_COMM_BUFFERS:
+        return None
+    bufs = _A2A_BUF_CACHE.get((tuple(shape), dtype, device))
+    return bufs.pop() if bufs else None
+
+
+def _get_comm_buffer(like: Tensor) -> Tensor:
+    buf = _pop_comm_buffer(like.shape, like.dtype, like.device)
+    if buf is not None:
+        return buf
+    return torch.empty_like(like)
+
+
+def _put_comm_buffer(buf: Tensor) -> None:
+    if not _REUSE_COMM_BUFFERS:
+        return
+    bufs = _A2A_BUF_CACHE[(tuple(buf.shape), buf.dtype, buf.device)]
+    # a retained-graph backward re-enters the same ctx; never pool one buffer twice
+    if len(bufs) < _A2A_BUF_CACHE_DEPTH and not any(b is buf for b in bufs):
+        bufs.append(buf)
+
+
+MOE_COMM_STREAM = None
+
+
+def get_moe_comm_stream() -> torch.cuda.Stream:
+    global MOE_COMM_STREAM
+    if MOE_COMM_STREAM is None:
+        MOE_COMM_STREAM = torch.cuda.Stream()
+    return MOE_COMM_STREAM
+
+
+def wait_chunk(handles: List[Tuple[Any, torch.cuda.Event]], idx: int) -> None:
+    """Make the current stream wait until chunk `idx` of a chunked all-to-all
+    (see `AllToAll.forward` with `num_chunks > 1`) has been dispatched.
+    """
+    _, event = handles[idx]
+    event.wait(torch.cuda.current_stream())
 
 
 class AllGather(torch.autograd.Function):
@@ -36,12 +140,17 @@ class AllGather(torch.autograd.Function):
         if ctx is not None:
             ctx.comm_grp = group
 
-        comm_size = dist.get_world_size(group)
+        comm_size = _pg_info(group)[0]
         if comm_size == 1:
             return inputs.unsqueeze(0), None
 
         buffer_shape = (comm_size,) + inputs.shape
         outputs = torch.empty(buffer_shape, dtype=inputs.dtype, device=inputs.device)
+        if hasattr(dist, "all_gather_into_tensor"):
+            handle = dist.all_gather_into_tensor(outputs, inputs.contiguous(), group=group, async_op=overlap)
+            return outputs, handle if overlap else None
+        # fallback for old torch without the `_base` collectives; the list()
+        # wrap is required, dist's tensor-list check rejects tuples
         buffer_list = list(torch.chunk(outputs, comm_size, dim=0))
         if not overlap:
             dist.all_gather(buffer_list, inputs, group=group)
@@ -77,7 +186,7 @@ class ReduceScatter(torch.autograd.Function):
         if ctx is not None:
             ctx.comm_grp = group
 
-        comm_size = dist.get_world_size(group)
+        comm_size = _pg_info(group)[0]
         if comm_size == 1:
             return inputs.squeeze(0), None
 
@@ -86,6 +195,11 @@ class ReduceScatter(torch.autograd.Function):
 
         output_shape = inputs.shape[1:]
         outputs = torch.empty(output_shape, dtype=inputs.dtype, device=inputs.device)
+        if hasattr(dist, "reduce_scatter_tensor"):
+            handle = dist.reduce_scatter_tensor(outputs, inputs, group=group, async_op=overlap)
+            return outputs, handle if overlap else None
+        # fallback for old torch without the `_base` collectives; the list()
+        # wrap is required, dist's tensor-list check rejects tuples
         buffer_list = list(torch.chunk(inputs, comm_size, dim=0))
         if not overlap:
             dist.reduce_scatter(outputs, buffer_list, group=group)
@@ -107,6 +221,11 @@ class ReduceScatter(torch.autograd.Function):
 class AllToAll(torch.autograd.Function):
     """Dispatches input tensor [e, c, h] to all experts by all_to_all_single
     operation in torch.distributed.
+
+    When `num_chunks > 1`, the input is split along dim 0 and dispatched as
+    `num_chunks` independent async all-to-alls on a dedicated communication
+    stream, so the caller can interleave expert computation on chunk `i` with
+    the dispatch of chunk `i + 1` (see `wait_chunk`).
     """
 
     @staticmethod
@@ -115,21 +234,47 @@ class AllToAll(torch.autograd.Function):
         inputs: Tensor,
         group: ProcessGroup,
         overlap: bool = False,
+        num_chunks: int = 1,
     ) -> Tuple[Tensor, Any]:
         """
         Returns:
-            outputs: Tensor
-            handle: Optional[Work], if overlap is True
+            outputs: Tensor. With `num_chunks > 1`, its dim-0 chunks hold the
+                per-chunk all-to-all results in chunk order.
+            handle: Optional[Work], if overlap is True; with `num_chunks > 1`,
+                a list of (work, event) pairs, one per chunk, for `wait_chunk`.
         """
         assert ctx is not None or not overlap
 
         if ctx is not None:
             ctx.comm_grp = group
+            ctx.num_chunks = num_chunks
         if not inputs.is_contiguous():
             inputs = inputs.contiguous()
-        if dist.get_world_size(group) == 1:
+        if _pg_info(group)[0] == 1:
             return inputs, None
-        output = torch.empty_like(inputs)
+        output = _get_comm_buffer(inputs)
+        if ctx is not None and _REUSE_COMM_BUFFERS:
+            ctx.save_for_backward(output)
+        if num_chunks > 1:
+            in_chunks = inputs.chunk(num_chunks, dim=0)
+            out_chunks = output.chunk(num_chunks, dim=0)
+            comm_stream = get_moe_comm_stream()
+            comm_stream.wait_stream(torch.cuda.current_stream())
+            handles = []
+            with torch.cuda.stream(comm_stream):
+                for in_chunk, out_chunk in zip(in_chunks, out_chunks):
+                    work = dist.all_to_all_single(out_chunk, in_chunk.contiguous(), group=group, async_op=True)
+                    # block comm_stream (not the host) on the NCCL stream, so the
+                    # recorded event tracks completion of this chunk's collective
+                    work.wait()
+                    handles.append((work, comm_stream.record_event()))
+            inputs.record_stream(comm_stream)
+            output.record_stream(comm_stream)
+            if overlap:
+                return output, handles
+            for idx in range(num_chunks):
+                wait_chunk(handles, idx)
+            return output, None
         if not overlap:
             dist.all_to_all_single(output, inputs, group=group)
             return output, None
@@ -138,39 +283,108 @@ class AllToAll(torch.autograd.Function):
             return output, handle
 
     @staticmethod
-    def backward(ctx: Any, *grad_outputs) -> Tuple[Tensor, None, None]:
-        return (
-            AllToAll.forward(None, grad_outputs[0], ctx.comm_grp, False)[0],
-            None,
-            None,
-        )
+    def backward(ctx: Any, *grad_outputs) -> Tuple[Tensor, None, None, None]:
+        grad = AllToAll.forward(None, grad_outputs[0], ctx.comm_grp, False, ctx.num_chunks)[0]
+        # with reuse enabled, the forward output is released by the autograd
+        # graph after this point, so its buffer can go back to the pool
+        if ctx.saved_tensors:
+            _put_comm_buffer(ctx.saved_tensors[0])
+        return grad, None, None, None
+
+
+# permutation indices of _hier_permute, keyed on (rows, cols, device); the layout
+# only depends on the group sizes, so it is computed once and reused every step
+_HIER_PERM_CACHE: dict = {}
+
+
+def _hier_permute(inputs: Tensor, rows: int, cols: int) -> Tensor:
+    """Block-transpose the leading dimension of `inputs` from (rows, cols)
+    chunk order to (cols, rows) chunk order with a single coalesced copy,
+    instead of materializing O(rows * cols) views and concatenating them.
+    """
+    key = (rows, cols, inputs.device)
+    idx = _HIER_PERM_CACHE.get(key)
+    if idx is None:
+        idx = torch.arange(rows * cols, device=inputs.device, dtype=torch.int32).view(rows, cols).t().reshape(-1)
+        _HIER_PERM_CACHE[key] = idx
+    return inputs.view(rows * cols, -1).index_select(0, idx).view(inputs.shape)
+
+
+# number of micro-chunks the hierarchical all-to-all is pipelined over, so the
+# inter-node exchange of one chunk overlaps the intra-node phases of the other
+_HIER_NUM_CHUNKS = 2
+
+_HIER_STREAMS = None
+
+
+def _get_hier_streams() -> Tuple[torch.cuda.Stream, torch.cuda.Stream]:
+    global _HIER_STREAMS
+    if _HIER_STREAMS is None:
+        _HIER_STREAMS = (torch.cuda.Stream(), torch.cuda.Stream())
+    return _HIER_STREAMS
 
 
 class HierarchicalAllToAll(torch.autograd.Function):
     @staticmethod
-    def forward(ctx: Any, inputs: Tensor, groups: Tuple[ProcessGroup, ProcessGroup], src_rank: int) -> Tensor:
-        """
-        Returns:
-            outputs: Tensor
-        """
-        # TODO: we can reduce comm volume by removing empty capacity
-        if ctx is not None:
-            ctx.comm_grps = groups
-            ctx.src_rank = src_rank
-        intra_node_group, inter_node_group = groups
+    def _exchange(
+        inputs: Tensor,
+        outputs: Tensor,
+        intra_node_group: ProcessGroup,
+        inter_node_group: Optional[ProcessGroup],
+        local_world_size: int,
+        num_group: int,
+        is_leader: bool,
+    ) -> None:
+        """One full gather / inter-node all-to-all / scatter exchange writing into `outputs`."""
+        world_size = local_world_size * num_group
+
+        # intra-node gather: one ring allgather on every rank instead of a
+        # serialized point-to-point gather onto the leader
+        intra_buffer = torch.empty((local_world_size,) + inputs.shape, dtype=inputs.dtype, device=inputs.device)
+        dist.all_gather_into_tensor(intra_buffer, inputs.contiguous(), group=intra_node_group)
+
+        if is_leader:
+            intra_output = _hier_permute(intra_buffer.flatten(0, 1), local_world_size, world_size)
 
-        local_world_size = dist.get_world_size(intra_node_group)
-        num_group = dist.get_world_size(inter_node_group) if inter_node_group is not None else 1
+            # inter-node all-to-all
+            if inter_node_group is not None:
+                inter_output = torch.empty_like(intra_output)
+                dist.all_to_all_single(inter_output, intra_output, group=inter_node_group)
+
+                # layout transform
+                intra_output = _hier_permute(inter_output, num_group, local_world_size)
+        else:
+            # only the leader holds the exchanged tokens; the other ranks
+            # contribute zeros so the reduce-scatter below hands every rank
+            # its slice without a serialized scatter
+            intra_output = torch.zeros(
+                (local_world_size * inputs.size(0),) + inputs.shape[1:], dtype=inputs.dtype, device=inputs.device
+            )
+
+        # intra-node scatter
+        dist.reduce_scatter_tensor(outputs, intra_output, group=intra_node_group)
+
+    @staticmethod
+    def _exchange_gather_scatter(
+        inputs: Tensor,
+        outputs: Tensor,
+        intra_node_group: ProcessGroup,
+        inter_node_group: Optional[ProcessGroup],
+        local_world_size: int,
+        num_group: int,
+        src_rank: int,
+    ) -> None:
+        """Point-to-point exchange via gather/scatter onto the leader. Slower
+        than `_exchange`, but gloo implements neither `all_gather_into_tensor`
+        nor `reduce_scatter_tensor`, so CPU tensors keep this form.
+        """
         world_size = local_world_size * num_group
-        outputs = torch.empty_like(inputs)
 
         if dist.get_rank() == src_rank:
             # intra-node gather
             intra_output = [torch.empty_like(inputs) for _ in range(local_world_size)]
             dist.gather(inputs, intra_output, dst=src_rank, group=intra_node_group)
-
-            intra_output = [v.chunk(world_size, dim=0) for v in intra_output]
-            intra_output = torch.cat(sum(zip(*intra_output), ()))
+            intra_output = _hier_permute(torch.cat(intra_output), local_world_size, world_size)
 
             # inter-node all-to-all
             if inter_node_group is not None:
@@ -178,18 +392,126 @@ class HierarchicalAllToAll(torch.autograd.Function):
                 dist.all_to_all_single(inter_output, intra_output, group=inter_node_group)
 
                 # layout transform
-                inter_output = inter_output.chunk(num_group, dim=0)
-                inter_output = [v.chunk(local_world_size, dim=0) for v in inter_output]
-                intra_output = torch.cat(sum(zip(*inter_output), ()))
+                intra_output = _hier_permute(inter_output, num_group, local_world_size)
 
             # intra-node scatter
             intra_output = list(intra_output.chunk(local_world_size, dim=0))
             dist.scatter(outputs, intra_output, src=src_rank, group=intra_node_group)
-
         else:
             dist.gather(inputs, dst=src_rank, group=intra_node_group)
             dist.scatter(outputs, src=src_rank, group=intra_node_group)
 
+    @staticmethod
+    def _exchange_pipelined(
+        inputs: Tensor,
+        outputs: Tensor,
+        intra_node_group: ProcessGroup,
+        inter_node_group: Optional[ProcessGroup],
+        local_world_size: int,
+        num_group: int,
+        is_leader: bool,
+    ) -> None:
+        """Pipelined exchange: the capacity dimension is split into
+        `_HIER_NUM_CHUNKS` micro-chunks, the intra-node collectives run on one
+        stream and the leader's inter-node phase on another, with events
+        enforcing the per-chunk dependencies. While the inter-node all-to-all
+        of chunk `i` is in flight, the intra-node gather of chunk `i + 1`
+        proceeds in parallel, so NVLink and IB bandwidth are used concurrently.
+        """
+        world_size = local_world_size * num_group
+        inputs = inputs.contiguous()
+        tail_shape = tuple(inputs.shape[1:])
+        intra_stream, inter_stream = _get_hier_streams()
+        current_stream = torch.cuda.current_stream()
+        intra_stream.wait_stream(current_stream)
+        inter_stream.wait_stream(current_stream)
+
+        # split the capacity of every per-rank chunk so each micro-chunk keeps
+        # the (world_size, capacity) layout the exchange expects
+        in_chunks = inputs.view(world_size, -1, *tail_shape).chunk(_HIER_NUM_CHUNKS, dim=1)
+        out_chunks = outputs.view(world_size, -1, *tail_shape).chunk(_HIER_NUM_CHUNKS, dim=1)
+
+        # phase 1: intra-node gather per micro-chunk
+        gather_buffers, gather_events = [], []
+        with torch.cuda.stream(intra_stream):
+            for in_chunk in in_chunks:
+                flat_chunk = in_chunk.reshape(-1, *tail_shape)
+                buffer = torch.empty(
+                    (local_world_size,) + flat_chunk.shape, dtype=inputs.dtype, device=inputs.device
+                )
+                dist.all_gather_into_tensor(buffer, flat_chunk, group=intra_node_group)
+                gather_buffers.append(buffer)
+                gather_events.append(intra_stream.record_event())
+        inputs.record_stream(intra_stream)
+
+        # phase 2: permute + inter-node all-to-all on the leader
+        payloads, inter_events = [], []
+        with torch.cuda.stream(inter_stream):
+            for buffer, gather_event in zip(gather_buffers, gather_events):
+                inter_stream.wait_event(gather_event)
+                if is_leader:
+                    payload = _hier_permute(buffer.flatten(0, 1), local_world_size, world_size)
+                    if inter_node_group is not None:
+                        inter_output = torch.empty_like(payload)
+                        dist.all_to_all_single(inter_output, payload, group=inter_node_group)
+                        payload = _hier_permute(inter_output, num_group, local_world_size)
+                else:
+                    payload = torch.zeros(
+                        (buffer.size(0) * buffer.size(1),) + tail_shape, dtype=inputs.dtype, device=inputs.device
+                    )
+                buffer.record_stream(inter_stream)
+                payloads.append(payload)
+                inter_events.append(inter_stream.record_event())
+
+        # phase 3: intra-node reduce-scatter per micro-chunk
+        final_events = []
+        with torch.cuda.stream(intra_stream):
+            for out_chunk, payload, inter_event in zip(out_chunks, payloads, inter_events):
+                intra_stream.wait_event(inter_event)
+                scatter_out = torch.empty(
+                    (payload.size(0) // local_world_size,) + tail_shape, dtype=inputs.dtype, device=inputs.device
+                )
+                dist.reduce_scatter_tensor(scatter_out, payload, group=intra_node_group)
+                out_chunk.copy_(scatter_out.view(out_chunk.shape))
+                payload.record_stream(intra_stream)
+                final_events.append(intra_stream.record_event())
+        outputs.record_stream(intra_stream)
+
+        for final_event in final_events:
+            final_event.wait(current_stream)
+
+    @staticmethod
+    def forward(ctx: Any, inputs: Tensor, groups: Tuple[ProcessGroup, ProcessGroup], src_rank: int) -> Tensor:
+        """
+        Returns:
+            outputs: Tensor
+        """
+        # TODO: we can reduce comm volume by removing empty capacity
+        if ctx is not None:
+            ctx.comm_grps = groups
+            ctx.src_rank = src_rank
+        intra_node_group, inter_node_group = groups
+
+        local_world_size = _pg_info(intra_node_group)[0]
+        num_group = _pg_info(inter_node_group)[0] if inter_node_group is not None else 1
+        world_size = local_world_size * num_group
+        outputs = torch.empty_like(inputs)
+        is_leader = _pg_info(None)[1] == src_rank
+
+        if not inputs.is_cuda:
+            # gloo lacks the `_base` collectives the exchanges below rely on
+            HierarchicalAllToAll._exchange_gather_scatter(
+                inputs, outputs, intra_node_group, inter_node_group, local_world_size, num_group, src_rank
+            )
+        elif world_size > 1 and inputs.size(0) % (world_size * _HIER_NUM_CHUNKS) == 0:
+            HierarchicalAllToAll._exchange_pipelined(
+                inputs, outputs, intra_node_group, inter_node_group, local_world_size, num_group, is_leader
+            )
+        else:
+            HierarchicalAllToAll._exchange(
+                inputs, outputs, intra_node_group, inter_node_group, local_world_size, num_group, is_leader
+            )
+
         return outputs
 
     @staticmethod
@@ -209,9 +531,7 @@ class MoeDispatch(torch.autograd.Function):
         h = tokens.size(1)
         dtype = tokens.dtype
 
-        if MOE_KERNEL is None:
-            load_moe()
-        if tokens.dtype != torch.float32:
+        if tokens.dtype not in MOE_KERNEL_DTYPES:
             tokens = tokens.to(torch.float32)
         expert_input = MOE_KERNEL.dispatch_forward(s, ec, h, tokens, mask, dest_idx)
         if expert_input.dtype != dtype:
@@ -228,7 +548,7 @@ class MoeDispatch(torch.autograd.Function):
     @custom_bwd
     def backward(ctx, output_grad):
         mask, dest_idx = ctx.saved_tensors
-        if output_grad.dtype != torch.float32:
+        if output_grad.dtype not in MOE_KERNEL_DTYPES:
             output_grad = output_grad.to(torch.float32)
         d_tokens = MOE_KERNEL.dispatch_backward(ctx.s, ctx.ec, ctx.h, output_grad, mask, dest_idx)
         if d_tokens.dtype != ctx.dtype:
@@ -248,10 +568,11 @@ class MoeCombine(torch.autograd.Function):
         h = expert_tokens.size(-1)
         dtype = expert_tokens.dtype
 
-        if expert_tokens.dtype != torch.float32:
+        if expert_tokens.dtype not in MOE_KERNEL_DTYPES:
             expert_tokens = expert_tokens.to(torch.float32)
-        if MOE_KERNEL is None:
-            load_moe()
+        # the kernel requires tokens and logits in the same dtype; logits are tiny (s, e)
+        if logits.dtype != expert_tokens.dtype:
+            logits = logits.to(expert_tokens.dtype)
         output = MOE_KERNEL.combine_forward(s, e, c, h, expert_tokens, logits, mask, dest_idx)
         if output.dtype != dtype:
             output = output.to(dtype)
@@ -269,27 +590,195 @@ class MoeCombine(torch.autograd.Function):
     @custom_bwd
     def backward(ctx, tokens_grad):
         expert_tokens, logits, mask, dest_idx = ctx.saved_tensors
-        if tokens_grad.dtype != torch.float32:
-            tokens_grad = tokens_grad.to(torch.float32)
+        if tokens_grad.dtype != expert_tokens.dtype:
+            tokens_grad = tokens_grad.to(expert_tokens.dtype)
 
         d_expert, d_logits = MOE_KERNEL.combine_backward(
             ctx.s, ctx.e, ctx.c, ctx.h, tokens_grad, expert_tokens, logits, mask, dest_idx
         )
         if d_expert.dtype != ctx.dtype:
             d_expert = d_expert.to(ctx.dtype)
+        if d_logits.dtype != torch.float32:
+            d_logits = d_logits.to(torch.float32)
+
+        return d_expert, d_logits, None, None, None
+
+
+class MoeDispatchQuant(torch.autograd.Function):
+    """Numerics reference for dispatching the token payload as int8.
+
+    Tokens are quantized per token (symmetric, one fp scale per row) before
+    the permutation and dequantized on the expert side, so the expert input
+    carries exactly the rounding error an int8 transport would introduce.
+    Quantization, permutation and dequantization all happen locally; this
+    moves no fewer bytes than `MoeDispatch` and is not a bandwidth
+    optimization. The gradient takes the straight-through path of the
+    reference dispatch. `MoeDispatch` remains the exact implementation;
+    opt in via `moe_dispatch_quant`.
+    """
+
+    @staticmethod
+    @custom_fwd
+    def forward(ctx, tokens, mask, dest_idx, ec):
+        s = tokens.size(0)
+        h = tokens.size(1)
+        dtype = tokens.dtype
+
+        tokens_fp32 = tokens.float()
+        scales = tokens_fp32.abs().amax(dim=-1, keepdim=True).clamp_(min=1e-8).div_(127.0)
+        quantized = tokens_fp32.div_(scales).round_().to(torch.int8)
+        # route the int8 payload and the scales with integer indexing only;
+        # unrouted (mask == 0) tokens go to a scratch row that is sliced off,
+        # so no boolean-mask indexing (and thus no host sync) is needed
+        rows = torch.where(mask.bool(), dest_idx.long(), ec)
+        expert_quant = torch.zeros((ec + 1, h), dtype=torch.int8, device=tokens.device)
+        expert_scales = torch.zeros((ec + 1, 1), dtype=scales.dtype, device=tokens.device)
+        for route_rows in rows:
+            expert_quant[route_rows] = quantized
+            expert_scales[route_rows] = scales
+        expert_input = expert_quant[:ec].to(scales.dtype).mul_(expert_scales[:ec])
+        if expert_input.dtype != dtype:
+            expert_input = expert_input.to(dtype)
+        ctx.save_for_backward(mask, dest_idx)
+        ctx.s = s
+        ctx.h = h
+        ctx.ec = ec
+        ctx.dtype = dtype
+
+        return expert_input
+
+    @staticmethod
+    @custom_bwd
+    def backward(ctx, output_grad):
+        # straight-through: gradients flow through the reference dispatch
+        mask, dest_idx = ctx.saved_tensors
+        if output_grad.dtype not in MOE_KERNEL_DTYPES:
+            output_grad = output_grad.to(torch.float32)
+        d_tokens = MOE_KERNEL.dispatch_backward(ctx.s, ctx.ec, ctx.h, output_grad.contiguous(), mask, dest_idx)
+        if d_tokens.dtype != ctx.dtype:
+            d_tokens = d_tokens.to(ctx.dtype)
+        return d_tokens, None, None, None
+
 
+def moe_dispatch_quant(tokens: Tensor, mask: Tensor, dest_idx: Tensor, ec: int) -> Tensor:
+    return MoeDispatchQuant.apply(tokens, mask, dest_idx, ec)
+
+
+# `torch.autograd.Function` is opaque to torch.compile and forces a graph break
+# around every dispatch/combine. When torch.library.custom_op is available
+# (torch >= 2.4), register both as ABI-stable custom ops with fake impls so
+# Inductor can schedule and fuse around them; `moe_dispatch`/`moe_combine`
+# below pick the best path automatically.
+_TORCH_CUSTOM_OP_AVAILABLE = hasattr(torch.library, "custom_op")
+
+if _TORCH_CUSTOM_OP_AVAILABLE:
+
+    @torch.library.custom_op("colossal_moe::dispatch", mutates_args=())
+    def _moe_dispatch_op(tokens: Tensor, mask: Tensor, dest_idx: Tensor, ec: int) -> Tensor:
+        s, h = tokens.size(0), tokens.size(1)
+        dtype = tokens.dtype
+        if dtype not in MOE_KERNEL_DTYPES:
+            tokens = tokens.to(torch.float32)
+        expert_input = MOE_KERNEL.dispatch_forward(s, ec, h, tokens.contiguous(), mask, dest_idx)
+        if expert_input.dtype != dtype:
+            expert_input = expert_input.to(dtype)
+        return expert_input
+
+    @_moe_dispatch_op.register_fake
+    def _(tokens: Tensor, mask: Tensor, dest_idx: Tensor, ec: int) -> Tensor:
+        return tokens.new_empty((ec, tokens.size(1)))
+
+    def _moe_dispatch_setup_context(ctx, inputs, output) -> None:
+        tokens, mask, dest_idx, ec = inputs
+        ctx.save_for_backward(mask, dest_idx)
+        ctx.s = tokens.size(0)
+        ctx.h = tokens.size(1)
+        ctx.ec = ec
+        ctx.dtype = tokens.dtype
+
+    def _moe_dispatch_backward(ctx, output_grad):
+        mask, dest_idx = ctx.saved_tensors
+        if output_grad.dtype not in MOE_KERNEL_DTYPES:
+            output_grad = output_grad.to(torch.float32)
+        d_tokens = MOE_KERNEL.dispatch_backward(ctx.s, ctx.ec, ctx.h, output_grad.contiguous(), mask, dest_idx)
+        if d_tokens.dtype != ctx.dtype:
+            d_tokens = d_tokens.to(ctx.dtype)
+        # one gradient per op input: tokens, mask, dest_idx, ec
+        return d_tokens, None, None, None
+
+    torch.library.register_autograd(
+        "colossal_moe::dispatch", _moe_dispatch_backward, setup_context=_moe_dispatch_setup_context
+    )
+
+    @torch.library.custom_op("colossal_moe::combine", mutates_args=())
+    def _moe_combine_op(expert_tokens: Tensor, logits: Tensor, mask: Tensor, dest_idx: Tensor, ec: int) -> Tensor:
+        s, e = logits.size(0), logits.size(1)
+        c = ec // e
+        h = expert_tokens.size(-1)
+        dtype = expert_tokens.dtype
+        if dtype not in MOE_KERNEL_DTYPES:
+            expert_tokens = expert_tokens.to(torch.float32)
+        if logits.dtype != expert_tokens.dtype:
+            logits = logits.to(expert_tokens.dtype)
+        output = MOE_KERNEL.combine_forward(s, e, c, h, expert_tokens.contiguous(), logits, mask, dest_idx)
+        if output.dtype != dtype:
+            output = output.to(dtype)
+        return output
+
+    @_moe_combine_op.register_fake
+    def _(expert_tokens: Tensor, logits: Tensor, mask: Tensor, dest_idx: Tensor, ec: int) -> Tensor:
+        return expert_tokens.new_empty((logits.size(0), expert_tokens.size(-1)))
+
+    def _moe_combine_setup_context(ctx, inputs, output) -> None:
+        expert_tokens, logits, mask, dest_idx, ec = inputs
+        ctx.save_for_backward(expert_tokens, logits, mask, dest_idx)
+        ctx.s = logits.size(0)
+        ctx.e = logits.size(1)
+        ctx.c = ec // ctx.e
+        ctx.h = expert_tokens.size(-1)
+
+    def _moe_combine_backward(ctx, tokens_grad):
+        expert_tokens, logits, mask, dest_idx = ctx.saved_tensors
+        dtype = expert_tokens.dtype
+        if expert_tokens.dtype not in MOE_KERNEL_DTYPES:
+            expert_tokens = expert_tokens.to(torch.float32)
+        if logits.dtype != expert_tokens.dtype:
+            logits = logits.to(expert_tokens.dtype)
+        if tokens_grad.dtype != expert_tokens.dtype:
+            tokens_grad = tokens_grad.to(expert_tokens.dtype)
+        d_expert, d_logits = MOE_KERNEL.combine_backward(
+            ctx.s, ctx.e, ctx.c, ctx.h, tokens_grad.contiguous(), expert_tokens.contiguous(), logits, mask, dest_idx
+        )
+        if d_expert.dtype != dtype:
+            d_expert = d_expert.to(dtype)
+        if d_logits.dtype != torch.float32:
+            d_logits = d_logits.to(torch.float32)
+        # one gradient per op input: expert_tokens, logits, mask, dest_idx, ec
         return d_expert, d_logits, None, None, None
 
+    torch.library.register_autograd(
+        "colossal_moe::combine", _moe_combine_backward, setup_context=_moe_combine_setup_context
+    )
+
+
+def moe_dispatch(tokens: Tensor, mask: Tensor, dest_idx: Tensor, ec: int) -> Tensor:
+    if _TORCH_CUSTOM_OP_AVAILABLE:
+        return torch.ops.colossal_moe.dispatch(tokens, mask, dest_idx, ec)
+    return MoeDispatch.apply(tokens, mask, dest_idx, ec)
+
+
+def moe_combine(expert_tokens: Tensor, logits: Tensor, mask: Tensor, dest_idx: Tensor, ec: int) -> Tensor:
+    if _TORCH_CUSTOM_OP_AVAILABLE:
+        return torch.ops.colossal_moe.combine(expert_tokens, logits, mask, dest_idx, ec)
+    return MoeCombine.apply(expert_tokens, logits, mask, dest_idx, ec)
+
 
 def moe_cumsum(inputs: Tensor, use_kernel: bool = False):
-    dim0 = inputs.size(0)
-    flag = (dim0 <= 1024) or (dim0 <= 2048 and dim0 % 2 == 0) or (dim0 % 4 == 0)
-    if flag and use_kernel:
-        if MOE_KERNEL is None:
-            load_moe()
+    # the custom kernel only pays off for small dim0 where launch overhead dominates;
+    # torch's cumsum is already the optimized path for large inputs
+    if use_kernel and inputs.size(0) <= 256:
         return MOE_KERNEL.cumsum_sub_one(inputs)
-    else:
-        return torch.cumsum(inputs, dim=0) - 1
+    return torch.cumsum(inputs, dim=0).sub_(1)
 
 
 class EPGradScalerIn(torch.autograd.Function):
@@ -300,15 +789,15 @@ class EPGradScalerIn(torch.autograd.Function):
 
     @staticmethod
     def forward(ctx: Any, inputs: Tensor, ep_size: int) -> Tensor:
-        ctx.ep_size = ep_size
+        ctx.scale = float(ep_size)
         return inputs
 
     @staticmethod
     def backward(ctx: Any, *grad_outputs: Tensor) -> Tuple[Tensor, None]:
         assert len(grad_outputs) == 1
         grad = grad_outputs[0]
-        if ctx.ep_size != 1:
-            grad = grad * ctx.ep_size
+        if ctx.scale != 1.0:
+            grad.mul_(ctx.scale)
         return grad, None
 
 
@@ -320,15 +809,15 @@ class EPGradScalerOut(torch.autograd.Function):
 
     @staticmethod
     def forward(ctx: Any, inputs: Tensor, ep_size: int) -> Tensor:
-        ctx.ep_size = ep_size
+        ctx.scale = 1.0 / ep_size
         return inputs
 
     @staticmethod
     def backward(ctx: Any, *grad_outputs: Tensor) -> Tuple[Tensor, None]:
         assert len(grad_outputs) == 1
         grad = grad_outputs[0]
-        if ctx.ep_size != 1:
-            grad = grad / ctx.ep_size
+        if ctx.scale != 1.0:
+            grad.mul_(ctx.scale)
         return grad, None
 
 
@@ -341,16 +830,15 @@ class DPGradScalerIn(torch.autograd.Function):
     @staticmethod
     def forward(ctx: Any, inputs: Tensor, moe_dp_size: int, activated_experts: int) -> Tensor:
         assert activated_experts != 0, f"shouldn't be called when no expert is activated"
-        ctx.moe_dp_size = moe_dp_size
-        ctx.activated_experts = activated_experts
+        ctx.scale = activated_experts / moe_dp_size
         return inputs
 
     @staticmethod
     def backward(ctx: Any, *grad_outputs: Tensor) -> Tuple[Tensor, None, None]:
         assert len(grad_outputs) == 1
         grad = grad_outputs[0]
-        if ctx.moe_dp_size != ctx.activated_experts:
-            grad.mul_(ctx.activated_experts / ctx.moe_dp_size)
+        if ctx.scale != 1.0:
+            grad.mul_(ctx.scale)
         return grad, None, None
 
 
@@ -363,19 +851,50 @@ class DPGradScalerOut(torch.autograd.Function):
     @staticmethod
     def forward(ctx: Any, inputs: Tensor, moe_dp_size: int, activated_experts: int) -> Tensor:
         assert activated_experts != 0, f"shouldn't be called when no expert is activated"
-        ctx.moe_dp_size = moe_dp_size
-        ctx.activated_experts = activated_experts
+        ctx.scale = moe_dp_size / activated_experts
         return inputs
 
     @staticmethod
     def backward(ctx: Any, *grad_outputs: Tensor) -> Tuple[Tensor, None, None]:
         assert len(grad_outputs) == 1
         grad = grad_outputs[0]
-        if ctx.moe_dp_size != ctx.activated_experts:
-            grad.mul_(ctx.moe_dp_size / ctx.activated_experts)
+        if ctx.scale != 1.0:
+            grad.mul_(ctx.scale)
         return grad, None, None
 
 
+# the grad scalers have identity forwards whose only purpose is to hook a
+# backward; these factories skip the autograd.Function entirely (and its
+# per-call ctx allocation) when no gradient can flow or the scale is 1
+
+
+def ep_grad_scaler_in(inputs: Tensor, ep_size: int) -> Tensor:
+    if ep_size == 1 or not torch.is_grad_enabled():
+        return inputs
+    return EPGradScalerIn.apply(inputs, ep_size)
+
+
+def ep_grad_scaler_out(inputs: Tensor, ep_size: int) -> Tensor:
+    if ep_size == 1 or not torch.is_grad_enabled():
+        return inputs
+    return EPGradScalerOut.apply(inputs, ep_size)
+
+
+def dp_grad_scaler_in(inputs: Tensor, moe_dp_size: int, activated_experts: int) -> Tensor:
+    # `activated_experts` may be a 0-dim device tensor at the call sites, so
+    # comparing it against `moe_dp_size` here would force a host sync every
+    # forward; only skip based on grad mode and leave the comparison to backward
+    if not torch.is_grad_enabled():
+        return inputs
+    return DPGradScalerIn.apply(inputs, moe_dp_size, activated_experts)
+
+
+def dp_grad_scaler_out(inputs: Tensor, moe_dp_size: int, activated_experts: int) -> Tensor:
+    if not torch.is_grad_enabled():
+        return inputs
+    return DPGradScalerOut.apply(inputs, moe_dp_size, activated_experts)
+
+
 def _all_to_all(
     inputs: torch.Tensor,
     input_split_sizes: Optional[List[int]] = None,
@@ -383,18 +902,47 @@ def _all_to_all(
     group=None,
     async_op: bool = False,
     fp8_communication: bool = False,
+    num_chunks: int = 1,
+    out: Optional[Tensor] = None,
 ):
     """
     Returns:
         outputs: Tensor
-        handle: Optional[Work], if overlap is True
+        handle: Optional[Work], if overlap is True; with `num_chunks > 1`, a
+            list of (work, event) pairs, one per chunk, for `wait_chunk`
     """
     outputs_shape = list(inputs.shape)
     if output_split_sizes is not None:
         outputs_shape[0] = sum(output_split_sizes)
-    outputs = torch.empty(outputs_shape, dtype=inputs.dtype, device=inputs.device)
-    inputs = inputs.contiguous()
-    outputs = outputs.contiguous()
+    if out is None:
+        outputs = torch.empty(outputs_shape, dtype=inputs.dtype, device=inputs.device)
+    else:
+        assert list(out.shape) == outputs_shape and out.dtype == inputs.dtype
+        outputs = out
+    if not inputs.is_contiguous():
+        inputs = inputs.contiguous()
+    if num_chunks > 1:
+        assert input_split_sizes is None and output_split_sizes is None, "chunked all-to-all requires even splits"
+        assert not fp8_communication, "chunked all-to-all does not support fp8 communication"
+        in_chunks = inputs.chunk(num_chunks, dim=0)
+        out_chunks = outputs.chunk(num_chunks, dim=0)
+        comm_stream = get_moe_comm_stream()
+        comm_stream.wait_stream(torch.cuda.current_stream())
+        handles = []
+        with torch.cuda.stream(comm_stream):
+            for in_chunk, out_chunk in zip(in_chunks, out_chunks):
+                work = dist.all_to_all_single(out_chunk, in_chunk.contiguous(), group=group, async_op=True)
+                # block comm_stream (not the host) on the NCCL stream, so the
+                # recorded event tracks completion of this chunk's collective
+                work.wait()
+                handles.append((work, comm_stream.record_event()))
+        inputs.record_stream(comm_stream)
+        outputs.record_stream(comm_stream)
+        if async_op:
+            return outputs, handles
+        for idx in range(num_chunks):
+            wait_chunk(handles, idx)
+        return outputs, None
     if fp8_communication:
         handle = all_to_all_single_fp8(
             outputs, inputs, output_split_sizes, input_split_sizes, group=group, async_op=False
@@ -416,6 +964,7 @@ class AllToAllUneven(torch.autograd.Function):
         group=None,
         overlap: bool = False,
         fp8_communication: bool = False,
+        num_chunks: int = 1,
     ):
         """
         Returns:
@@ -425,14 +974,43 @@ class AllToAllUneven(torch.autograd.Function):
         ctx.input_split_sizes = input_split_sizes
         ctx.output_split_sizes = output_split_sizes
         ctx.group = group
-        return _all_to_all(
-            inputs, input_split_sizes, output_split_sizes, group, overlap, fp8_communication=fp8_communication
+        ctx.num_chunks = num_chunks
+        outputs, handle = _all_to_all(
+            inputs,
+            input_split_sizes,
+            output_split_sizes,
+            group,
+            overlap,
+            fp8_communication=fp8_communication,
+            num_chunks=num_chunks,
         )
+        if _REUSE_COMM_BUFFERS:
+            ctx.save_for_backward(outputs)
+        return outputs, handle
 
     @staticmethod
     def backward(ctx: Any, *grad_outputs):
+        # with reuse enabled, the forward output has been consumed by downstream
+        # backwards already, so its buffer can go back to the pool (and may even
+        # serve as the output of the gradient all-to-all when splits are symmetric)
+        if ctx.saved_tensors:
+            _put_comm_buffer(ctx.saved_tensors[0])
+        grad = grad_outputs[0]
+        out_shape = list(grad.shape)
+        if ctx.input_split_sizes is not None:
+            out_shape[0] = sum(ctx.input_split_sizes)
+        out = _pop_comm_buffer(out_shape, grad.dtype, grad.device)
         return (
-            _all_to_all(grad_outputs[0], ctx.output_split_sizes, ctx.input_split_sizes, ctx.group, False)[0],
+            _all_to_all(
+                grad,
+                ctx.output_split_sizes,
+                ctx.input_split_sizes,
+                ctx.group,
+                False,
+                num_chunks=ctx.num_chunks,
+                out=out,
+            )[0],
+            None,
             None,
             None,
             None,
@@ -448,8 +1026,84 @@ def all_to_all_uneven(
     group=None,
     overlap: bool = False,
     fp8_communication: bool = False,
+    num_chunks: int = 1,
 ):
     assert (
         inputs.requires_grad
     ), "Input must require grad to assure that backward is executed, otherwise it might hang the program."
-    return AllToAllUneven.apply(inputs, input_split_sizes, output_split_sizes, group, overlap, fp8_communication)
+    return AllToAllUneven.apply(
+        inputs, input_split_sizes, output_split_sizes, group, overlap, fp8_communication, num_chunks
+    )
+
+
+def _gather_tokens(input_: Tensor, dim: int, tp_group: ProcessGroup) -> Tensor:
+    """Gather tokens from all ranks of `tp_group` and concatenate them along `dim`."""
+    world_size = _pg_info(tp_group)[0]
+    input_ = input_.contiguous()
+    gathered = torch.empty((world_size,) + tuple(input_.shape), dtype=input_.dtype, device=input_.device)
+    if hasattr(dist, "all_gather_into_tensor"):
+        dist.all_gather_into_tensor(gathered, input_, group=tp_group)
+    else:
+        # fallback for old torch without the `_base` collectives: gather straight
+        # into views of the stacked buffer so no extra copy is needed afterwards
+        dist.all_gather(list(gathered.unbind(0)), input_, group=tp_group)
+    if dim == 0:
+        return gathered.view(-1, *input_.shape[1:])
+    # a single coalesced copy moves the gathered axis into place; reshape on the
+    # permuted view materializes the contiguous result directly
+    out_shape = [s * world_size if i == dim else s for i, s in enumerate(input_.shape)]
+    return gathered.movedim(0, dim).reshape(out_shape)
+
+
+def _drop_tokens(input_: Tensor, dim: int, tp_group: ProcessGroup) -> Tensor:
+    """Keep only the slice of `input_` along `dim` owned by the local rank."""
+    world_size, rank = _pg_info(tp_group)
+    assert input_.size(dim) % world_size == 0, f"dim {dim} of size {input_.size(dim)} is not divisible by {world_size}"
+    chunk_size = input_.size(dim) // world_size
+    return input_.narrow(dim, rank * chunk_size, chunk_size).contiguous()
+
+
+class _GatherTokens(torch.autograd.Function):
+    """Gather tokens along `dim` in the tensor-parallel group."""
+
+    @staticmethod
+    def forward(ctx: Any, input_: Tensor, dim: int, tp_group: ProcessGroup) -> Tensor:
+        ctx.dim = dim
+        ctx.tp_group = tp_group
+        return _gather_tokens(input_, dim, tp_group)
+
+    @staticmethod
+    def backward(ctx: Any, grad_output: Tensor) -> Tuple[Tensor, None, None]:
+        return _drop_tokens(grad_output, ctx.dim, ctx.tp_group), None, None
+
+
+class _DropTokens(torch.autograd.Function):
+    """Keep only the local slice of the tokens along `dim` in the tensor-parallel group."""
+
+    @staticmethod
+    def forward(ctx: Any, input_: Tensor, dim: int, tp_group: ProcessGroup) -> Tensor:
+        ctx.dim = dim
+        ctx.tp_group = tp_group
+        return _drop_tokens(input_, dim, tp_group)
+
+    @staticmethod
+    def backward(ctx: Any, grad_output: Tensor) -> Tuple[Tensor, None, None]:
+        return _gather_tokens(grad_output, ctx.dim, ctx.tp_group), None, None
+
+
+def gather_tokens(input_: Tensor, dim: int = 0, tp_group: Optional[ProcessGroup] = None) -> Tensor:
+    if _pg_info(tp_group)[0] == 1:
+        return input_
+    if not torch.is_grad_enabled():
+        # inference path: skip autograd graph construction entirely
+        return _gather_tokens(input_, dim, tp_group)
+    return _GatherTokens.apply(input_, dim, tp_group)
+
+
+def drop_tokens(input_: Tensor, dim: int = 0, tp_group: Optional[ProcessGroup] = None) -> Tensor:
+    if _pg_info(tp_group)[0] == 1:
+        return input_
+    if not torch.is_grad_enabled():
+        # inference path: skip autograd graph construction entirely
+        return _drop_tokens(input_, dim, tp_group)
+    return _DropTokens.apply(input_, dim, tp_group)
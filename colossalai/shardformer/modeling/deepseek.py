@@ -17,11 +17,11 @@ from transformers.utils import is_flash_attn_2_available, logging
 
 from colossalai.lazy import LazyInitContext
 from colossalai.moe._operation import (
-    DPGradScalerIn,
-    DPGradScalerOut,
-    EPGradScalerIn,
-    EPGradScalerOut,
     all_to_all_uneven,
+    dp_grad_scaler_in,
+    dp_grad_scaler_out,
+    ep_grad_scaler_in,
+    ep_grad_scaler_out,
 )
 from colossalai.pipeline.stage_manager import PipelineStageManager
 from colossalai.quantization.fp8 import all_reduce_fp8
@@ -171,14 +171,14 @@ class EPDeepseekMoE(nn.Module):
             self.ep_group,
             fp8_communication=self.fp8_communication,
         )
-        output_states = EPGradScalerIn.apply(output_states, self.ep_size)
+        output_states = ep_grad_scaler_in(output_states, self.ep_size)
 
         if output_states.size(0) > 0:
             if self.num_experts_per_ep == 1:
                 expert = self.experts[self.expert_start_idx]
-                output_states = DPGradScalerIn.apply(output_states, self.moe_dp_size, activate_experts[0])
+                output_states = dp_grad_scaler_in(output_states, self.moe_dp_size, activate_experts[0])
                 output_states = expert(output_states)
-                output_states = DPGradScalerOut.apply(output_states, self.moe_dp_size, activate_experts[0])
+                output_states = dp_grad_scaler_out(output_states, self.moe_dp_size, activate_experts[0])
             else:
                 output_states_splits = output_states.split(output_split_sizes.tolist())
                 output_states_list = []
@@ -186,16 +186,16 @@ class EPDeepseekMoE(nn.Module):
                     if split_states.size(0) == 0:  # no token routed to this experts
                         continue
                     expert = self.experts[self.expert_start_idx + i % self.num_experts_per_ep]
-                    split_states = DPGradScalerIn.apply(
+                    split_states = dp_grad_scaler_in(
                         split_states, self.moe_dp_size, activate_experts[i % self.num_experts_per_ep]
                     )
                     split_states = expert(split_states)
-                    split_states = DPGradScalerOut.apply(
+                    split_states = dp_grad_scaler_out(
                         split_states, self.moe_dp_size, activate_experts[i % self.num_experts_per_ep]
                     )
                     output_states_list.append(split_states)
                 output_states = torch.cat(output_states_list)
-        output_states = EPGradScalerOut.apply(output_states, self.ep_size)
+        output_states = ep_grad_scaler_out(output_states, self.ep_size)
         dispatch_states, _ = all_to_all_uneven(
             output_states, output_split_list, input_split_list, self.ep_group, fp8_communication=self.fp8_communication
         )
@@ -4,6 +4,7 @@
 
 #include <cub/cub.cuh>
 
+#include "common/micros.h"
 #include "funcs/reduce_function.h"
 
 using colossalAI::funcs::block_reduce;
@@ -539,22 +540,6 @@ void cumsum_launch(int *inputs, int *outputs, const int s, const int e) {
 
 // API FUNCTIONS --------------------------------
 
-#define DISPATCH_FLOAT_AND_HALF_MOE(TYPE, NAME, ...)                   \
-  switch (TYPE) {                                                      \
-    case at::ScalarType::Float: {                                      \
-      using scalar_t = float;                                          \
-      __VA_ARGS__;                                                     \
-      break;                                                           \
-    }                                                                  \
-    case at::ScalarType::Half: {                                       \
-      using scalar_t = at::Half;                                       \
-      __VA_ARGS__;                                                     \
-      break;                                                           \
-    }                                                                  \
-    default:                                                           \
-      AT_ERROR(#NAME, " not implemented yet for specific data type."); \
-  }
-
 torch::Tensor moe_dispatch_cuda_forward(int s, int ec, int h,
                                         torch::Tensor batch_tokens,
                                         torch::Tensor mask,
@@ -565,7 +550,7 @@ torch::Tensor moe_dispatch_cuda_forward(int s, int ec, int h,
       torch::dtype(batch_tokens.dtype()).device(batch_tokens.device()));
   auto k = mask.size(0);
 
-  DISPATCH_FLOAT_AND_HALF_MOE(
+  DISPATCH_FLOAT_HALF_AND_BFLOAT(
       batch_tokens.scalar_type(), "moe dispatch forward",
       moe_dpch_fwd_launch<scalar_t>(
           batch_tokens.data_ptr<scalar_t>(), res.data_ptr<scalar_t>(),
@@ -585,7 +570,7 @@ torch::Tensor moe_dispatch_cuda_backward(int s, int ec, int h,
       {s, h}, torch::dtype(expert_grad.dtype()).device(expert_grad.device()));
   auto k = mask.size(0);
 
-  DISPATCH_FLOAT_AND_HALF_MOE(
+  DISPATCH_FLOAT_HALF_AND_BFLOAT(
       expert_grad.scalar_type(), "moe dispatch backward",
       moe_dpch_bwd_launch<scalar_t>(
           res.data_ptr<scalar_t>(), expert_grad.data_ptr<scalar_t>(),
@@ -608,7 +593,7 @@ torch::Tensor moe_combine_cuda_forward(int s, int e, int c, int h,
       torch::dtype(expert_tokens.dtype()).device(expert_tokens.device()));
   auto k = mask.size(0);
 
-  DISPATCH_FLOAT_AND_HALF_MOE(
+  DISPATCH_FLOAT_HALF_AND_BFLOAT(
       expert_tokens.scalar_type(), "moe combine forward",
       moe_cb_fwd_launch<scalar_t>(
           expert_tokens.data_ptr<scalar_t>(), res.data_ptr<scalar_t>(),
@@ -635,7 +620,7 @@ std::vector<torch::Tensor> moe_combine_cuda_backward(
            {s, e}, torch::dtype(logits.dtype()).device(logits.device()));
   auto k = mask.size(0);
 
-  DISPATCH_FLOAT_AND_HALF_MOE(
+  DISPATCH_FLOAT_HALF_AND_BFLOAT(
       tokens_grad.scalar_type(), "moe combine backward",
       moe_cb_bwd_launch<scalar_t>(
           tokens_grad.data_ptr<scalar_t>(), egrad.data_ptr<scalar_t>(),
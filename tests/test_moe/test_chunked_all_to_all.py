@@ -0,0 +1,73 @@
+import pytest
+import torch
+import torch.distributed as dist
+
+import colossalai
+from colossalai.moe._operation import AllToAll, all_to_all_uneven, wait_chunk
+from colossalai.testing import rerun_if_address_is_in_use, spawn
+
+NUM_CHUNKS = 2
+HIDDEN_SIZE = 16
+
+
+def run_chunked_all_to_all():
+    world_size = dist.get_world_size()
+    rank = dist.get_rank()
+    rows = world_size * NUM_CHUNKS * 2
+    inputs = torch.arange(rows * HIDDEN_SIZE, dtype=torch.float32, device="cuda").reshape(rows, HIDDEN_SIZE)
+    inputs = inputs + rank * 10000
+
+    ref = torch.empty_like(inputs)
+    dist.all_to_all_single(ref, inputs)
+
+    # non-overlap path: output must be complete when forward returns
+    outputs, _ = AllToAll.apply(inputs, None, False, NUM_CHUNKS)
+    torch.cuda.synchronize()
+    assert torch.equal(outputs, ref)
+
+    # overlap path: each chunk must be complete after its wait_chunk
+    outputs, handles = AllToAll.apply(inputs, None, True, NUM_CHUNKS)
+    out_chunks = outputs.chunk(NUM_CHUNKS, dim=0)
+    ref_chunks = ref.chunk(NUM_CHUNKS, dim=0)
+    for idx in range(NUM_CHUNKS):
+        wait_chunk(handles, idx)
+        torch.cuda.synchronize()
+        assert torch.equal(out_chunks[idx], ref_chunks[idx])
+
+
+def run_chunked_all_to_all_uneven_grad():
+    world_size = dist.get_world_size()
+    rank = dist.get_rank()
+    rows = world_size * NUM_CHUNKS * 2
+
+    torch.manual_seed(42 + rank)
+    inputs = torch.randn(rows, HIDDEN_SIZE, device="cuda", requires_grad=True)
+    grad_out = torch.randn(rows, HIDDEN_SIZE, device="cuda")
+
+    ref_inputs = inputs.detach().clone().requires_grad_(True)
+    ref_outputs, _ = all_to_all_uneven(ref_inputs)
+    ref_outputs.backward(grad_out)
+
+    outputs, _ = all_to_all_uneven(inputs, num_chunks=NUM_CHUNKS)
+    torch.cuda.synchronize()
+    assert torch.equal(outputs, ref_outputs)
+    outputs.backward(grad_out)
+    torch.cuda.synchronize()
+    assert torch.equal(inputs.grad, ref_inputs.grad)
+
+
+def run_dist(rank, world_size, port):
+    colossalai.launch(rank=rank, world_size=world_size, host="localhost", port=port, backend="nccl")
+    run_chunked_all_to_all()
+    run_chunked_all_to_all_uneven_grad()
+
+
+@pytest.mark.dist
+@pytest.mark.parametrize("world_size", [2])
+@rerun_if_address_is_in_use()
+def test_chunked_all_to_all(world_size):
+    spawn(run_dist, world_size)
+
+
+if __name__ == "__main__":
+    test_chunked_all_to_all(world_size=2)
@@ -0,0 +1,55 @@
+import pytest
+import torch
+import torch.distributed as dist
+
+import colossalai
+from colossalai.moe._operation import all_to_all_uneven, enable_comm_buffer_reuse
+from colossalai.testing import rerun_if_address_is_in_use, spawn
+
+NUM_STEPS = 3
+HIDDEN_SIZE = 16
+
+
+def run_all_to_all_uneven_with_reuse():
+    world_size = dist.get_world_size()
+    rank = dist.get_rank()
+    rows = world_size * 4
+
+    torch.manual_seed(7 + rank)
+    enable_comm_buffer_reuse()
+    try:
+        # repeated same-shape steps, so later iterations run on recycled buffers
+        for _ in range(NUM_STEPS):
+            inputs = torch.randn(rows, HIDDEN_SIZE, device="cuda", requires_grad=True)
+            outputs, _ = all_to_all_uneven(inputs)
+            # with reuse on, the forward output may be overwritten during
+            # backward, so it has to be snapshotted before backward
+            outputs_snapshot = outputs.detach().clone()
+            grad_out = torch.randn(rows, HIDDEN_SIZE, device="cuda")
+            outputs.backward(grad_out)
+
+            ref_outputs = torch.empty_like(outputs_snapshot)
+            dist.all_to_all_single(ref_outputs, inputs.detach())
+            ref_grad = torch.empty_like(grad_out)
+            dist.all_to_all_single(ref_grad, grad_out)
+            torch.cuda.synchronize()
+            assert torch.equal(outputs_snapshot, ref_outputs)
+            assert torch.equal(inputs.grad, ref_grad)
+    finally:
+        enable_comm_buffer_reuse(False)
+
+
+def run_dist(rank, world_size, port):
+    colossalai.launch(rank=rank, world_size=world_size, host="localhost", port=port, backend="nccl")
+    run_all_to_all_uneven_with_reuse()
+
+
+@pytest.mark.dist
+@pytest.mark.parametrize("world_size", [2])
+@rerun_if_address_is_in_use()
+def test_comm_buffer_reuse(world_size):
+    spawn(run_dist, world_size)
+
+
+if __name__ == "__main__":
+    test_comm_buffer_reuse(world_size=2)
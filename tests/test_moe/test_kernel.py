@@ -4,7 +4,7 @@ import pytest
 import torch
 
 from colossalai.accelerator import get_accelerator
-from colossalai.moe._operation import MoeCombine, MoeDispatch, moe_cumsum
+from colossalai.moe._operation import MoeCombine, MoeDispatch, moe_combine, moe_cumsum, moe_dispatch, moe_dispatch_quant
 
 NUM_EXPERTS = 4
 BATCH_SIZE = 4
@@ -87,8 +87,69 @@ def run_moe_dispatch_combine_fwd_bwd(data_type=torch.float32, hidden_size=128, n
         check_equal(grad_no_kernel, grad_kernel, 1e-2)
 
 
+def run_moe_custom_op_fwd_bwd(data_type=torch.float32, hidden_size=8, num_experts=2, capacity=2):
+    device = get_accelerator().get_current_device()
+    ec = num_experts * capacity
+    # identity routing: token i goes to slot i
+    mask = torch.ones(1, BATCH_SIZE, dtype=torch.int32, device=device)
+    dest_idx = torch.arange(BATCH_SIZE, dtype=torch.int32, device=device).unsqueeze(0)
+
+    tokens = torch.randn(BATCH_SIZE, hidden_size, dtype=data_type, device=device, requires_grad=True)
+    logits = torch.randn(BATCH_SIZE, num_experts, dtype=torch.float32, device=device, requires_grad=True)
+    ref_tokens = tokens.detach().clone().requires_grad_(True)
+    ref_logits = logits.detach().clone().requires_grad_(True)
+
+    # the dispatchers route through torch.ops.colossal_moe on torch >= 2.4 and
+    # must match the autograd.Function reference in both forward and backward
+    out = moe_combine(moe_dispatch(tokens, mask, dest_idx, ec), logits, mask, dest_idx, ec)
+    ref = MoeCombine.apply(MoeDispatch.apply(ref_tokens, mask, dest_idx, ec), ref_logits, mask, dest_idx, ec)
+    check_equal(out, ref)
+
+    grad = torch.randn_like(out)
+    out.backward(grad)
+    ref.backward(grad)
+    check_equal(tokens.grad, ref_tokens.grad)
+    check_equal(logits.grad, ref_logits.grad)
+
+
+def run_moe_dispatch_quant_fwd_bwd(data_type=torch.float32, hidden_size=8, num_experts=2, capacity=2):
+    device = get_accelerator().get_current_device()
+    ec = num_experts * capacity
+    # identity routing: token i goes to slot i
+    mask = torch.ones(1, BATCH_SIZE, dtype=torch.int32, device=device)
+    dest_idx = torch.arange(BATCH_SIZE, dtype=torch.int32, device=device).unsqueeze(0)
+
+    tokens = torch.randn(BATCH_SIZE, hidden_size, dtype=data_type, device=device, requires_grad=True)
+    ref_tokens = tokens.detach().clone().requires_grad_(True)
+
+    # per-token symmetric int8 quantization bounds the error by one step of
+    # max(|row|) / 127 per element
+    dispatch_data = moe_dispatch_quant(tokens, mask, dest_idx, ec)
+    quant_step = tokens.detach().float().abs().amax(dim=-1, keepdim=True) / 127.0
+    check_equal(dispatch_data.float(), tokens.detach().float(), atol=quant_step.max().item())
+
+    # backward is straight-through: gradients must match the exact dispatch
+    ref_dispatch = MoeDispatch.apply(ref_tokens, mask, dest_idx, ec)
+    grad = torch.randn_like(dispatch_data)
+    dispatch_data.backward(grad)
+    ref_dispatch.backward(grad)
+    check_equal(tokens.grad, ref_tokens.grad)
+
+
 @pytest.mark.parametrize("data_type", [torch.float32, torch.float16])
 def test_moe_kernel(data_type):
     torch.manual_seed(1024)
     run_moe_cumsum()
     run_moe_dispatch_combine_fwd_bwd(data_type=data_type)
+
+
+@pytest.mark.parametrize("data_type", [torch.float32, torch.float16])
+def test_moe_custom_op(data_type):
+    torch.manual_seed(1024)
+    run_moe_custom_op_fwd_bwd(data_type=data_type)
+
+
+@pytest.mark.parametrize("data_type", [torch.float32, torch.float16])
+def test_moe_dispatch_quant(data_type):
+    torch.manual_seed(1024)
+    run_moe_dispatch_quant_fwd_bwd(data_type=data_type)